@@ -1,18 +1,167 @@
+import dataclasses
+import functools
 import hashlib
 import logging
+import operator
 import os
 import re
+import sys
+import threading
+import tomllib
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
-import toml
+import tomli_w
 import git
 
-import pandas as pd
 from dotenv import dotenv_values
 
 import pickle
 
+_CAMEL_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+# minimum number of objects without a parameter digest, and minimum size of the array and DataFrame
+# buffers they hold, before they are digested in parallel
+_PARALLEL_DIGEST_MIN = 4
+_PARALLEL_DIGEST_MIN_BYTES = 1 << 20
+
+# number of computed objects kept in memory; the least recently used one is released first
+_INSTANCE_CACHE_SIZE = 32
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env():
+    """Read the .env files once per process. Call _load_env.cache_clear() to re-read them."""
+    return {
+        **dotenv_values("example.env"),
+        **dotenv_values(".env"),
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _git_info():
+    """Read the current git commit and remote once per process. Returns None outside of a repo."""
+    try:
+        repo = git.Repo(search_parent_directories=True)
+    except git.exc.InvalidGitRepositoryError:
+        return None
+    # both are read from the files in .git; repo.head.object would start a git process to look up
+    # the commit object
+    info = {"git_commit": git.SymbolicReference.dereference_recursive(repo, "HEAD")}
+    if "origin" in repo.remotes:
+        info["git_repo"] = repo.remotes.origin.url
+    return info
+
+
+@functools.cache
+def _dataclass_layout(cls):
+    """
+    The digest header and the encoded field names of a dataclass, and a function that returns the
+    field values as a tuple. Computed once per class.
+    """
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    if len(names) == 0:
+        get_values = lambda obj: ()
+    elif len(names) == 1:
+        get_value = operator.attrgetter(names[0])
+        get_values = lambda obj: (get_value(obj),)
+    else:
+        get_values = operator.attrgetter(*names)
+
+    type_name = f"{cls.__module__}.{cls.__qualname__}".encode("UTF-8")
+    header = b"@" + type_name + b"\0"
+    return header, [name.encode("UTF-8") for name in names], get_values
+
+
+# values of these exact types are hashed by their repr, which does not depend on the pickle
+# protocol or the Python version
+_REPR_TYPES = frozenset({bool, int, float, complex, str, bytes, type(None)})
+
+
+def _buffer_nbytes(value) -> int:
+    """Size of the buffer of a NumPy array or pandas DataFrame, 0 for any other value"""
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray):
+        return value.nbytes
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    return 0
+
+
+def _digest_value(value) -> bytes:
+    """
+    Return the bytes that represent a value in the hash.
+
+    Scalars and strings are encoded by their repr, and lists, tuples, dicts, sets and dataclasses
+    are encoded element by element. Dict items and set elements are sorted, so that their order
+    does not matter. NumPy arrays and pandas DataFrames are hashed directly from their buffers;
+    pickling them would first copy the whole payload into a bytes object. Their type, shape,
+    columns and dtypes are encoded as text, so that the digest does not depend on the pickle
+    protocol. Everything else is pickled. The modules are looked up in sys.modules, since a value
+    can only be an array if numpy is already imported.
+    """
+    value_type = type(value)
+    if value_type in _REPR_TYPES:
+        return repr(value).encode("UTF-8")
+    if value_type is list:
+        return _join_digests(b"[", [_digest_value(v) for v in value])
+    if value_type is tuple:
+        return _join_digests(b"(", [_digest_value(v) for v in value])
+    if value_type is dict:
+        items = sorted((_digest_value(k), _digest_value(v)) for k, v in value.items())
+        return _join_digests(b"{", [d for item in items for d in item])
+    if value_type in (set, frozenset):
+        return _join_digests(b"<", sorted(_digest_value(v) for v in value))
+    if dataclasses.is_dataclass(value_type):
+        header, field_names, get_values = _dataclass_layout(value_type)
+        field_digests = []
+        for field_name, field_value in zip(field_names, get_values(value)):
+            field_digests.append(field_name)
+            field_digests.append(_digest_value(field_value))
+        return _join_digests(header, field_digests)
+
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        data = np.ascontiguousarray(value).reshape(-1).view(np.uint8)
+        type_name = f"{value_type.__module__}.{value_type.__qualname__}"
+        header = repr((type_name, value.dtype.descr, value.shape)).encode("UTF-8")
+        return _join_digests(b"a", [header, hashlib.blake2b(data, digest_size=20).digest()])
+
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        try:
+            rows = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        except TypeError:
+            # unhashable cells, e.g. lists
+            return pickle.dumps(value, protocol=5)
+        type_name = f"{value_type.__module__}.{value_type.__qualname__}"
+        columns = [(type(c).__name__, str(c)) for c in value.columns]
+        dtypes = [str(dtype) for dtype in value.dtypes]
+        header = repr((type_name, columns, dtypes)).encode("UTF-8")
+        return _join_digests(b"f", [header, hashlib.blake2b(rows, digest_size=20).digest()])
+
+    return pickle.dumps(value, protocol=5)
+
+
+def _join_digests(tag, digests) -> bytes:
+    """Concatenate the digests of the elements of a container, each prefixed with its length"""
+    return tag + b"".join(len(d).to_bytes(8, "little") + d for d in digests)
+
+
+def _update_framed(h, key, value_bytes):
+    """
+    Feed a key-value pair to the hasher as the key, a NUL byte, the length of the value and the
+    value, so that no two different sets of attributes produce the same stream.
+    """
+    h.update(key.encode("UTF-8"))
+    h.update(b"\0")
+    h.update(len(value_bytes).to_bytes(8, "little"))
+    h.update(value_bytes)
+
 
 class Cacheable(ABC):
     """
@@ -27,29 +176,89 @@ class Cacheable(ABC):
     considered to be the same. The reason why we do not hash the objects themselves is that this
     could be a very expensive operation.
 
-    This is an abstract class; the subclasses need to implement the create, load, and save methods.
+    The hash is split in two parts: a digest of the parameters, which is memoized on the instance,
+    and the hashes of the Cacheable objects it depends on. Assigning to an attribute of an object
+    resets its digest and invalidates the memoized hashes of all objects, so that the change
+    propagates to everything downstream. The computed object of the changed object is dropped, so
+    that it is not used by accident; the objects downstream keep theirs until they are computed
+    again, since an object does not know what depends on it. When computed again, the changed
+    object and everything downstream get a new hash and are created anew, while the rest is still
+    loaded from cache. Mutating an attribute in place is not detected.
+
+    The most recently computed objects are also kept in memory, so computing an object with the same
+    hash again in the same process returns the same instance without touching the disk. Every caller
+    gets that one instance, so mutating it in place changes it for all of them. Set keep_in_memory
+    to False on a subclass whose objects are too large to hold on to or are mutated after compute,
+    and call clear_cache() to release all of them.
+
+    This is an abstract class; the subclasses need to implement the create method. By default, the
+    object is pickled to <name>.pkl in the cache folder; override load_from_file and save_to_file to
+    use a different format.
     """
 
+    # attributes that do not change the object and can be set without resetting the memoized hash
+    _memo_keys = ("logger", "obj", "_hash", "_params_digest", "_cache_folder")
+    # attributes that do not enter the hash
+    _hash_exclude = frozenset(_memo_keys + ("run_tag",))
+    # bumped whenever an attribute of an already hashed object is reassigned; memoized hashes from
+    # an older generation are stale
+    _hash_generation = 0
+    # whether compute keeps the object in memory and returns it again for the same class and hash
+    keep_in_memory = True
+    # recently computed objects, keyed by (class, hash), in the order they were last used
+    _instance_cache: OrderedDict[tuple[type, str], Any] = OrderedDict()
+    _instance_cache_lock = threading.Lock()
+    # cache folders known to exist, keyed by (object folder, hash), so that other instances with the
+    # same hash do not need to scan the object folder again
+    _folder_cache: dict[tuple[Path, str], Path] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # convert class name to snake_case
+        cls.name = _CAMEL_RE.sub("_", cls.__name__).lower()
+
     def __init__(self, run_tag=""):
         self.run_tag = run_tag
-        # convert class name to snake_case
-        self.name = re.sub(r"(?<!^)(?=[A-Z])", "_", self.__class__.__name__).lower()
         self.logger = logging.getLogger("cache")
+        self._hash = None
+        self._params_digest = None
+        self._cache_folder = None
+
+    def __setattr__(self, key, value):
+        if key not in self._memo_keys:
+            # the run tag is not hashed, but it is part of the folder name
+            self.__dict__["_cache_folder"] = None
+        if key not in self._hash_exclude:
+            # the computed object belongs to the old parameters
+            self.__dict__.pop("obj", None)
+            if self.__dict__.get("_params_digest") is not None:
+                self.__dict__["_params_digest"] = None
+                Cacheable._hash_generation += 1
+        super().__setattr__(key, value)
 
     def compute(self):
+        # Return the object right away if it was already computed in this process
+        key = (type(self), self.hash())
+        if self.keep_in_memory:
+            with Cacheable._instance_cache_lock:
+                if key in Cacheable._instance_cache:
+                    Cacheable._instance_cache.move_to_end(key)
+                    self.obj = Cacheable._instance_cache[key]
+                    return self.obj
+
         cache_folder = self.cache_folder
         logger = self.logger
 
-        # Try to load the object from cache
-        if cache_folder.exists():
-            logger.info(f"Trying to load {self.name} from cache...")
-            try:
-                self.obj = self.load_from_file(cache_folder)
-                logger.info(f"✔️ Loaded {self.name} from {cache_folder}")
-                return self.obj
-            except FileNotFoundError:
-                logger.info(f"Failed to load {self.name}")
-                pass
+        # Try to load the object from cache. A missing folder raises FileNotFoundError just like a
+        # missing file, so there is no need to check that the folder exists first.
+        logger.info(f"Trying to load {self.name} from cache...")
+        try:
+            self.obj = self.load_from_file(cache_folder)
+            logger.info(f"✔️ Loaded {self.name} from {cache_folder}")
+            self._keep(key)
+            return self.obj
+        except FileNotFoundError:
+            logger.info(f"Failed to load {self.name}")
 
         # If the object is not in the cache, create it
         logger.info(f"Creating {self.name} from scratch...")
@@ -57,8 +266,74 @@ class Cacheable(ABC):
         logger.info(f"✔️ Successfully created {self.name}")
         self.save()
         logger.info(f"Saved {self.name} to {cache_folder}")
+        self._keep(key)
         return self.obj
 
+    def _keep(self, key):
+        """Keep the computed object in memory, releasing the least recently used one if needed"""
+        if not self.keep_in_memory:
+            return
+        with Cacheable._instance_cache_lock:
+            Cacheable._instance_cache[key] = self.obj
+            Cacheable._instance_cache.move_to_end(key)
+            while len(Cacheable._instance_cache) > _INSTANCE_CACHE_SIZE:
+                Cacheable._instance_cache.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Forget all objects and cache folders found in this process. The cache on disk is not
+        touched.
+        """
+        with Cacheable._instance_cache_lock:
+            Cacheable._instance_cache.clear()
+        Cacheable._folder_cache.clear()
+
+    @staticmethod
+    def compute_many(cacheables, max_workers=None) -> list[Any]:
+        """
+        Compute several Cacheable objects, running independent ones in parallel threads.
+
+        An object is computed only after all objects from the list that it depends on, directly or
+        indirectly. Objects whose dependencies are done are computed concurrently. Objects with the
+        same class and hash are computed once.
+
+        Args:
+            cacheables (list[Cacheable]): the objects to compute.
+            max_workers (int, optional): the number of threads; the ThreadPoolExecutor default if
+                not given.
+
+        Returns:
+            list: the computed objects, in the same order as cacheables.
+        """
+        # hash everything up front, so that the threads only read the memoized hashes
+        keys = [(type(c), c.hash()) for c in cacheables]
+        instances = {}
+        for key, c in zip(keys, cacheables):
+            instances.setdefault(key, []).append(c)
+        unique = {key: same_key[0] for key, same_key in instances.items()}
+
+        key_of = {id(c): key for key, c in zip(keys, cacheables)}
+        depends_on = {
+            key: {key_of[id(dep)] for dep in c._walk_dependencies() if id(dep) in key_of} - {key}
+            for key, c in unique.items()
+        }
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while len(results) < len(unique):
+                ready = [
+                    key for key in unique
+                    if key not in results and depends_on[key].issubset(results)
+                ]
+                for key, obj in zip(ready, pool.map(lambda key: unique[key].compute(), ready)):
+                    results[key] = obj
+                    # duplicates may be what a later object reads, so they get the object now
+                    for c in instances[key]:
+                        c.obj = obj
+
+        return [results[key] for key in keys]
+
     def load(self) -> Any:
         path = self.cache_folder
         try:
@@ -75,19 +350,44 @@ class Cacheable(ABC):
         pass
 
     @classmethod
-    @abstractmethod
     def load_from_file(cls, path) -> Any:
-        """Load the object from cache"""
-        pass
+        """
+        Load the object from cache. compute calls this without checking that the cache folder
+        exists, so an override must raise FileNotFoundError if the folder or the file is missing;
+        opening the file does that on its own.
+        """
+        with open(Path(path) / f"{cls.name}.pkl", "rb") as f:
+            return pickle.load(f)
 
     def save(self) -> None:
         """Save the object to cache"""
-        self.cache_folder.mkdir(parents=True, exist_ok=True)
-        self.save_to_file(self.cache_folder)
+        cache_folder = self.cache_folder
+        cache_folder.mkdir(parents=True, exist_ok=True)
+        Cacheable._folder_cache[(cache_folder.parent, self.hash())] = cache_folder
+        self.save_to_file(cache_folder)
 
-    @abstractmethod
     def save_to_file(self, path) -> None:
-        pass
+        """
+        Save the object to cache. The pickle is streamed to the file with protocol 5, which writes
+        large buffers such as numpy arrays directly instead of copying them into one bytes object.
+
+        The pickle is written to a temporary file that is then renamed, so that an interrupted save
+        never leaves a truncated file behind that would be loaded later. There is no fsync; a lost
+        cache file is simply created again.
+        """
+        file = Path(path) / f"{self.name}.pkl"
+        # a name unique to the process and thread, so that concurrent saves of the same object do
+        # not collide; created like open() would, so that the umask decides who can read the file
+        tmp_file = file.with_name(f"{file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        fd = os.open(tmp_file, flags, 0o666)
+        try:
+            with open(fd, "wb") as f:
+                pickle.dump(self.obj, f, protocol=5)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+        os.replace(tmp_file, file)
 
     def register(self, path: str | Path, comment="", save_git_commit=True):
         """
@@ -110,40 +410,45 @@ class Cacheable(ABC):
             "comment": comment,
             "run_tag": self.run_tag,
             "cache_folder": str(self.cache_folder),
-            "created_at": str(pd.Timestamp.now()),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
             "created_by": os.environ.get("USER", "unknown"),
         }
 
         if save_git_commit:
-            try:
-                repo = git.Repo(search_parent_directories=True)
-                sha = repo.head.object.hexsha
-                metadata["git_commit"] = sha
-                metadata["git_repo"] = repo.remotes.origin.url
-            except git.exc.InvalidGitRepositoryError:
+            git_info = _git_info()
+            if git_info is None:
                 self.logger.warning("Not a git repository, skipping git commit hash")
+            else:
+                metadata.update(git_info)
 
-        # save the metadata to a file
-        folder = Path(path).parent
-        folder.mkdir(parents=True, exist_ok=True)
-
-        with open(path, 'w') as f:
-            toml.dump(metadata, f)
+        # save the metadata to a file; the parent folder is only created if the first attempt fails
+        serialized = tomli_w.dumps(metadata)
+        path = Path(path)
+        try:
+            path.write_text(serialized, encoding="utf-8")
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(serialized, encoding="utf-8")
 
     @classmethod
     def load_from_register(cls, filename):
-        with open(filename, 'r') as f:
-            metadata = toml.load(f)
+        with open(filename, 'rb') as f:
+            metadata = tomllib.load(f)
         cache_folder = Path(metadata['cache_folder'])
         return cls.load_from_file(cache_folder)
 
     @property
     def cache_folder(self):
-        config = {
-            **dotenv_values("example.env"),
-            **dotenv_values(".env"),
-        }
-        cache_folder = os.environ.get("CACHE_FOLDER", config.get("CACHE_FOLDER"))
+        obj_hash = self.hash()
+        if self._cache_folder is None or self._cache_folder[0] != obj_hash:
+            self._cache_folder = (obj_hash, self._resolve_cache_folder(obj_hash))
+        return self._cache_folder[1]
+
+    def _resolve_cache_folder(self, obj_hash):
+        # the environment variable takes precedence, so the .env files are only read without it
+        cache_folder = os.environ.get("CACHE_FOLDER")
+        if cache_folder is None:
+            cache_folder = _load_env().get("CACHE_FOLDER")
         if cache_folder is None:
             raise ValueError(
                 "The CACHE_FOLDER environment variable is not set. Add it to your .env file."
@@ -152,8 +457,12 @@ class Cacheable(ABC):
 
         object_folder = cache_folder / self.name
         # If the cache folder already exists (even if with a different tag), return it
-        existing_folder = self.find_cache_folder(object_folder)
+        existing_folder = Cacheable._folder_cache.get((object_folder, obj_hash))
+        if existing_folder is not None:
+            return existing_folder
+        existing_folder = self.find_cache_folder(object_folder, obj_hash)
         if existing_folder:
+            Cacheable._folder_cache[(object_folder, obj_hash)] = existing_folder
             return existing_folder
 
         # If not, create a new folder. The folder has the following structure:
@@ -161,7 +470,7 @@ class Cacheable(ABC):
         name_components = [self.name]
         if len(self.run_tag) > 0:
             name_components.append(self.run_tag)
-        name_components.append(self.hash())
+        name_components.append(obj_hash)
 
         folder_name = "_".join(name_components)
 
@@ -170,66 +479,103 @@ class Cacheable(ABC):
         return path
 
     def hash(self):
-        hashstr = []
-
-        attributes = vars(self)
-
-        # exclude keys that should not change the object
-        exclude_keys = ["logger", "run_tag", "obj"]
-
-        for key in sorted(attributes.keys()):
-            if key in exclude_keys:
-                continue
-            value = attributes[key]
-            if isinstance(value, Cacheable):
-                value_hash = value.hash()
-            else:
-                value_hash = hashlib.sha1(pickle.dumps(value)).hexdigest()
-            hashstr.append(f"{key}: {value_hash}")
-
-        hashstr = "\n".join(hashstr)
-        hash = hashlib.sha1(hashstr.encode("UTF-8")).hexdigest()
-        return hash
+        generation = Cacheable._hash_generation
+        if self._hash is None or self._hash[0] != generation:
+            self._hash = (generation, self._compute_hash())
+        return self._hash[1]
+
+    def _compute_hash(self):
+        if self._params_digest is None:
+            self._compute_missing_digests()
+
+        h = hashlib.blake2b(self._params_digest, digest_size=20)
+        for key, value in sorted(vars(self).items()):
+            if key not in self._hash_exclude and isinstance(value, Cacheable):
+                _update_framed(h, key, value.hash().encode("UTF-8"))
+        return h.hexdigest()
+
+    def _compute_params_digest(self, shared_digests=None):
+        """
+        Digest of the class name and all attributes that are not Cacheable objects.
 
-    def find_cache_folder(self, object_folder):
+        shared_digests maps id(value) to the digest of the value, so that a value which several
+        objects depend on is only digested once.
+        """
+        if shared_digests is None:
+            shared_digests = {}
+
+        h = hashlib.blake2b(digest_size=20)
+        h.update(self.name.encode("UTF-8"))
+        h.update(b"\0")
+
+        for key, value in sorted(vars(self).items()):
+            if key not in self._hash_exclude and not isinstance(value, Cacheable):
+                value_digest = shared_digests.get(id(value))
+                if value_digest is None:
+                    value_digest = shared_digests[id(value)] = _digest_value(value)
+                _update_framed(h, key, value_digest)
+        return h.digest()
+
+    def _compute_missing_digests(self):
+        """
+        Compute the missing parameter digests of this object and all Cacheable objects it depends
+        on. Values shared between the objects are digested once. With many objects holding large
+        arrays or DataFrames, the digests are computed in a thread pool, since hashlib releases the
+        GIL while hashing large buffers. The pool only lives for this call, so no worker threads
+        are left behind for a forked child process to wait on.
+
+        The shared digests only live for this call: all values are alive while it runs, so their
+        ids are unique, and a value mutated in place later is digested again.
+        """
+        pending = [self]
+        pending += [obj for obj in self._walk_dependencies() if obj._params_digest is None]
+
+        # only the buffers that enter the hash count, not e.g. the computed object
+        hashed_nbytes = sum(
+            _buffer_nbytes(value)
+            for obj in pending
+            for key, value in vars(obj).items()
+            if key not in obj._hash_exclude
+        )
+        shared_digests = {}
+        if len(pending) < _PARALLEL_DIGEST_MIN or hashed_nbytes < _PARALLEL_DIGEST_MIN_BYTES:
+            digests = [obj._compute_params_digest(shared_digests) for obj in pending]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as pool:
+                digests = list(
+                    pool.map(lambda obj: obj._compute_params_digest(shared_digests), pending)
+                )
+        for obj, digest in zip(pending, digests):
+            obj._params_digest = digest
+
+    def _walk_dependencies(self):
+        """Yield every Cacheable object this one depends on, directly or indirectly, once"""
+        seen = {id(self)}
+        stack = [self]
+        while stack:
+            obj = stack.pop()
+            for key, value in vars(obj).items():
+                if isinstance(value, Cacheable) and key not in self._hash_exclude:
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        stack.append(value)
+                        yield value
+
+    def find_cache_folder(self, object_folder, obj_hash):
         """
         Try to find a folder <class_name>_<run_tag>_<hash>, where the class name and the hash
         must match, but the tag can be anything.
         """
-        if not object_folder.exists():
+        try:
+            entries = os.scandir(object_folder)
+        except FileNotFoundError:
             return False
 
-        pattern = rf"{self.name}_(.*_)?{self.hash()}"
-        for folder in object_folder.iterdir():
-            if re.match(pattern, folder.name):
-                return folder
+        # the folder name is <class_name>_[<run_tag>_]<hash>, so a prefix and a suffix check are
+        # enough to match it
+        prefix = f"{self.name}_"
+        with entries:
+            for entry in entries:
+                if entry.name.startswith(prefix) and entry.name.endswith(obj_hash):
+                    return Path(entry.path)
         return False
-
-    # @classmethod
-    # def fix_cache_folder(cls, old_folder):
-    #     """
-    #     A band-aid function in case I fucked up and need to update the hash in the name of the cache folder.
-    #     Load the object from the old folder, compute the hash of the object and rename the folder.
-    #     """
-    #     old_folder = Path(old_folder)
-
-    #     old_folder_name = old_folder.name
-
-    #     params_folder = old_folder / "params.json"
-    #     if not params_folder.exists():
-    #         raise FileNotFoundError(f"File {params_folder} does not exist")
-
-    #     params = params_from_json(params_folder)
-
-    #     old_hash = old_folder_name.split("_")[-1]
-    #     new_hash = cls.hash(params)
-
-    #     if old_hash == new_hash:
-    #         print("Hashes are the same, nothing to do")
-    #         return
-
-    #     old_components = old_folder_name.split("_")[:-1]
-    #     new_folder_name = "_".join(old_components + [new_hash])
-
-    #     shutil.move(old_folder, old_folder.parent / new_folder_name)
-    #     print(f"Renamed {old_folder_name} to {new_folder_name}")
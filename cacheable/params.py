@@ -1,10 +1,11 @@
 from dataclasses import dataclass, KW_ONLY
 from pathlib import Path
 
+import orjson
 from dataclass_wizard import JSONWizard
 
 
-@dataclass
+@dataclass(slots=True)
 class AbstractParams(JSONWizard):
     class _(JSONWizard.Meta):
         skip_defaults = False
@@ -21,13 +22,12 @@ def deepcopy(params):
 
 
 def params_to_json(params, path: Path):
-    json = params.to_json(indent=2)
-    with open(path, "w") as f:
-        f.write(json)
+    # to_dict applies the Meta options and converts fields such as Path that orjson cannot encode
+    json = orjson.dumps(params.to_dict(), option=orjson.OPT_INDENT_2)
+    Path(path).write_bytes(json)
 
 
 def params_from_json(path: Path):
-    with open(path) as f:
-        json = f.read()
-    params = AbstractParams.from_json(json)
+    data = orjson.loads(Path(path).read_bytes())
+    params = AbstractParams.from_dict(data)
     return params
@@ -0,0 +1,25 @@
+import pytest
+
+from cacheable.cache import Cacheable
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cache_folder(tmp_path_factory):
+    """Point the cache at an empty temporary folder for the whole test session."""
+    folder = tmp_path_factory.mktemp("cache")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("CACHE_FOLDER", str(folder))
+        yield folder
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(request, monkeypatch):
+    """The mock objects sleep in create() to imitate expensive work; skip the sleeping in tests."""
+    if hasattr(request.module, "sleep"):
+        monkeypatch.setattr(request.module, "sleep", lambda _seconds: None)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test without objects or cache folders remembered by an earlier test."""
+    Cacheable.clear_cache()
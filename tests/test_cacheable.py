@@ -6,29 +6,24 @@ except ImportError:
     raise
 
 from dataclass_wizard import JSONWizard
+from orjson import dumps as json_dumps, loads as json_loads
 
 import json
+import os
+import signal
 from pathlib import Path
 from time import sleep
 from tqdm import tqdm
+import dataclasses
 from dataclasses import dataclass
-import shutil
 
-import toml
+import tomllib
 
 from cacheable.cache import Cacheable
-from cacheable.params import AbstractParams
+from cacheable.params import AbstractParams, params_from_json, params_to_json
 
-from dotenv import dotenv_values
 
-cache_folder = dotenv_values(".env")["CACHE_FOLDER"]
-
-# clean the cache folder
-if Path(cache_folder).exists():
-    shutil.rmtree(cache_folder)
-
-
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Params(JSONWizard):
     """Mock params for testing purposes."""
 
@@ -42,6 +37,19 @@ class Params(JSONWizard):
     C2: str = "C2 param"
 
 
+@dataclass
+class PathParams(AbstractParams):
+    """Params with a field that JSON cannot encode natively."""
+
+    data_path: Path = Path("data")
+
+
+@pytest.fixture(scope="session")
+def params():
+    """The mock params shared by all tests. Use dataclasses.replace to change them."""
+    return Params()
+
+
 class A(Cacheable):
 
     def __init__(self, A1, A2, A3, run_tag=""):
@@ -51,20 +59,18 @@ class A(Cacheable):
         self.A3 = A3
 
     def create(self):
-        for _i in tqdm(range(10)):
+        for _i in tqdm(range(10), disable=None):
             sleep(0.1)
         return f"I am the object A with params {self.A1}, {self.A2}, {self.A3}"
 
     @classmethod
     def load_from_file(cls, path):
         file = path / "A.txt"
-        with open(file) as f:
-            return f.read()
+        return file.read_text(encoding="utf-8")
 
     def save_to_file(self, path):
         file = path / "A.txt"
-        with open(file, "w") as f:
-            f.write(self.obj)
+        file.write_text(self.obj, encoding="utf-8")
 
 
 class B(Cacheable):
@@ -75,18 +81,18 @@ class B(Cacheable):
         self.B1 = B1
 
     def create(self):
-        for _i in tqdm(range(100)):
+        for _i in tqdm(range(100), disable=None):
             sleep(0.1)
         return pd.DataFrame({"A3": [self.A3], "B1": [self.B1]})
 
     @classmethod
     def load_from_file(cls, path):
-        file = path / "B.csv"
-        return pd.read_csv(file)
+        file = path / "B.parquet"
+        return pd.read_parquet(file)
 
     def save_to_file(self, path):
-        file = path / "B.csv"
-        self.obj.to_csv(file)
+        file = path / "B.parquet"
+        self.obj.to_parquet(file, compression="zstd", index=False)
 
 
 class C(Cacheable):
@@ -98,29 +104,49 @@ class C(Cacheable):
         self.kwargs = kwargs
 
     def create(self):
-        for _i in tqdm(range(100)):
+        for _i in tqdm(range(100), disable=None):
             sleep(0.1)
         return {"A": self.A, "B": self.B, **(self.kwargs)}
 
     @classmethod
     def load_from_file(cls, path):
-        file = path / "C.csv"
-        with open(file) as f:
-            return json.load(f)
+        file = path / "C.json"
+        return json_loads(file.read_bytes())
 
     def save_to_file(self, path):
         file = path / "C.json"
         serial = self.kwargs.copy()
         serial["A"] = str(self.obj["A"])
         serial["B"] = str(self.obj["B"])
-        with open(file, "w") as f:
-            json.dump(serial, f)
+        file.write_bytes(json_dumps(serial))
 
 
-def test_cacheable_basic_compute():
-    """Test basic computation of cacheable objects A, B, and C."""
-    params = Params()
+class D(Cacheable):
+    """Uses the default pickle serialization."""
+
+    def __init__(self, D1, run_tag=""):
+        super().__init__(run_tag=run_tag)
+        self.D1 = D1
+
+    def create(self):
+        for _i in tqdm(range(10), disable=None):
+            sleep(0.1)
+        return pd.DataFrame({"D1": [self.D1] * 3, "x": [1.0, 2.0, 3.0]})
+
 
+class E(Cacheable):
+    """Depends on the computed object of another Cacheable."""
+
+    def __init__(self, A, run_tag=""):
+        super().__init__(run_tag=run_tag)
+        self.A = A
+
+    def create(self):
+        return self.A.obj.upper()
+
+
+def test_cacheable_basic_compute(params):
+    """Test basic computation of cacheable objects A, B, and C."""
     A_obj = A(params.A1, params.A2, params.A3).compute()
     B_obj = B(params.B1, A_obj).compute()
     C_obj = C(A_obj, B_obj, C1=params.C1, C2=params.C2).compute()
@@ -131,10 +157,8 @@ def test_cacheable_basic_compute():
     assert C_obj["A"] == A_obj
 
 
-def test_cacheable_load_with_different_tag():
+def test_cacheable_load_with_different_tag(params):
     """Test that changing run_tag loads from cache instead of creating new folder."""
-    params = Params()
-
     # First compute
     A(params.A1, params.A2, params.A3, run_tag="first").compute()
 
@@ -144,10 +168,8 @@ def test_cacheable_load_with_different_tag():
     assert "second" not in str(A_cache.cache_folder)
 
 
-def test_cacheable_load_with_empty_tag():
+def test_cacheable_load_with_empty_tag(params):
     """Test that empty run_tag also loads from cache."""
-    params = Params()
-
     # First compute
     A(params.A1, params.A2, params.A3, run_tag="tag").compute()
 
@@ -157,17 +179,15 @@ def test_cacheable_load_with_empty_tag():
     assert A_obj == f"I am the object A with params {params.A1}, {params.A2}, {params.A3}"
 
 
-def test_cacheable_new_folder_on_param_change():
+def test_cacheable_new_folder_on_param_change(params):
     """Test that changing a parameter creates a new folder with empty tag."""
-    params = Params()
-
     # First compute
     A_cache = A(params.A1, params.A2, params.A3)
     A_obj = A_cache.compute()
     old_cache_folder = A_cache.cache_folder
 
     # Change parameter - should create new folder with empty tag
-    params.A1 = "new A1"
+    params = dataclasses.replace(params, A1="new A1")
     A_cache = A(params.A1, params.A2, params.A3)
     A_obj = A_cache.compute()
 
@@ -177,10 +197,8 @@ def test_cacheable_new_folder_on_param_change():
     assert new_cache_folder != old_cache_folder
 
 
-def test_register_save_and_load():
+def test_register_save_and_load(params):
     """Test the register function."""
-    params = Params()
-
     filename = "./tests/A_test.toml"
 
     A_cache = A(params.A1, params.A2, params.A3)
@@ -190,8 +208,8 @@ def test_register_save_and_load():
     assert Path(filename).exists()
 
     # read the file and check contents
-    with open(filename) as f:
-        data_dict = toml.load(f)
+    with open(filename, "rb") as f:
+        data_dict = tomllib.load(f)
         assert data_dict["comment"] == "This is a registered A object"
         assert "git_commit" in data_dict.keys()
         assert "git_repo" in data_dict.keys()
@@ -199,3 +217,176 @@ def test_register_save_and_load():
     # load the file and check contents
     A_obj_loaded = A.load_from_register(filename)
     assert A_obj_loaded == A_obj
+
+
+def test_hash_dataframe_attribute():
+    """Test that DataFrame attributes are hashed by content."""
+    df = pd.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})
+
+    assert B(df).hash() == B(df.copy()).hash()
+    assert B(df).hash() != B(df.assign(x=[1, 2, 4])).hash()
+    assert B(df).hash() != B(df.rename(columns={"x": "z"})).hash()
+
+
+def test_hash_array_and_dataframe_without_pickle(monkeypatch):
+    """Test that arrays and DataFrames are hashed without pickle, whose protocol can change."""
+    df = pd.DataFrame({"x": [1, 2, 3]})
+    array = df["x"].to_numpy()
+    expected = (B(df).hash(), B(array).hash())
+
+    monkeypatch.setattr("cacheable.cache.pickle", None)
+    assert (B(df).hash(), B(array).hash()) == expected
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="os.fork is not available")
+def test_hash_in_forked_child():
+    """Test that hashing in parallel still works in a child forked after the parent did so."""
+
+    def hash_frames(seed):
+        frames = [pd.DataFrame({"x": range(seed + i, seed + i + 100_000)}) for i in range(3)]
+        return C(B(frames[0]), C(B(frames[1]), B(frames[2]))).hash()
+
+    hash_frames(0)
+    pid = os.fork()
+    if pid == 0:
+        # a child that hangs is killed by the alarm and exits with a nonzero status; a child that
+        # raises must not return into pytest, which would run the rest of the session again
+        try:
+            signal.alarm(10)
+            hash_frames(1)
+            os._exit(0)
+        except BaseException:
+            os._exit(1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_hash_propagates_dependency_change(params):
+    """Test that reassigning a parameter of a dependency changes the hash downstream."""
+    A_cache = A(params.A1, params.A2, params.A3)
+    C_cache = C(A_cache, params.B1)
+    old_hash = C_cache.hash()
+
+    A_cache.A1 = "new A1"
+    assert C_cache.hash() != old_hash
+
+    A_cache.A1 = params.A1
+    assert C_cache.hash() == old_hash
+
+
+def test_compute_reuses_object_in_process(params):
+    """Test that a second compute in the same process returns the object from memory."""
+    A_obj = A(params.A1, params.A2, params.A3).compute()
+    assert A(params.A1, params.A2, params.A3).compute() is A_obj
+
+    # after clearing the in-memory cache, the object is loaded from disk again
+    Cacheable.clear_cache()
+    A_loaded = A(params.A1, params.A2, params.A3).compute()
+    assert A_loaded == A_obj
+    assert A_loaded is not A_obj
+
+
+def test_memory_cache_is_bounded_and_optional(monkeypatch):
+    """Test that only the most recent objects are kept in memory, and none if a class opts out."""
+    monkeypatch.setattr("cacheable.cache._INSTANCE_CACHE_SIZE", 1)
+    D_obj = D("D1 memory").compute()
+    D("D2 memory").compute()
+    assert D("D1 memory").compute() is not D_obj
+
+    monkeypatch.setattr(D, "keep_in_memory", False)
+    D_obj = D("D1 memory").compute()
+    assert D("D1 memory").compute() is not D_obj
+
+
+def test_default_pickle_save_and_load():
+    """Test that an object without custom serialization is pickled to the cache folder."""
+    D_cache = D("D1 param")
+    D_obj = D_cache.compute()
+
+    assert (D_cache.cache_folder / "d.pkl").exists()
+
+    D_loaded = D("D1 param").load()
+    pd.testing.assert_frame_equal(D_loaded, D_obj)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="file modes are POSIX only")
+def test_default_pickle_respects_umask():
+    """Test that the default pickle gets the same mode as a file created with open()."""
+    old_umask = os.umask(0o022)
+    try:
+        D_cache = D("D1 umask")
+        D_cache.compute()
+    finally:
+        os.umask(old_umask)
+
+    assert (D_cache.cache_folder / "d.pkl").stat().st_mode & 0o777 == 0o644
+    assert not list(D_cache.cache_folder.glob("*.tmp"))
+
+
+def test_hash_dataclass_attribute(params):
+    """Test that dataclass attributes are hashed by their fields."""
+    assert A(params, params.A2, params.A3).hash() == A(Params(), params.A2, params.A3).hash()
+
+    new_params = dataclasses.replace(params, A1="new A1")
+    assert A(new_params, params.A2, params.A3).hash() != A(params, params.A2, params.A3).hash()
+
+
+def test_compute_many(params):
+    """Test that compute_many computes dependencies first and keeps the order of the input."""
+    A_cache = A(params.A1, params.A2, params.A3)
+    D_cache = D("D1 param")
+    E_cache = E(A_cache)
+
+    E_obj, A_obj, D_obj = Cacheable.compute_many([E_cache, A_cache, D_cache])
+
+    assert A_obj == f"I am the object A with params {params.A1}, {params.A2}, {params.A3}"
+    assert E_obj == A_obj.upper()
+    assert isinstance(D_obj, pd.DataFrame)
+    assert E_cache.obj is E_obj
+
+    # an object that depends on a duplicate is computed after the first instance
+    A_first = A("first A1", "first A2", "first A3")
+    A_second = A("first A1", "first A2", "first A3")
+    _, A_obj, E_obj = Cacheable.compute_many([A_first, A_second, E(A_second)])
+    assert A_second.obj is A_obj
+    assert E_obj == A_obj.upper()
+
+
+def test_param_change_recomputes_only_affected_objects(params, monkeypatch):
+    """Test that changing a parameter recomputes the objects that depend on it and nothing else."""
+    created = []
+    for cls in (D, E):
+        create = cls.create
+        monkeypatch.setattr(
+            cls, "create", lambda self, create=create: created.append(self.name) or create(self)
+        )
+
+    A_cache = A(params.A1, params.A2, params.A3)
+    D_cache = D("D1 param")
+    E_cache = E(A_cache)
+    Cacheable.compute_many([A_cache, D_cache, E_cache])
+    old_E_folder = E_cache.cache_folder
+
+    A_cache.A1 = "changed A1"
+    assert not hasattr(A_cache, "obj")
+
+    # without the in-memory cache, D can only be skipped by loading it from disk
+    Cacheable.clear_cache()
+    created.clear()
+    _, D_obj, E_obj = Cacheable.compute_many([A_cache, D_cache, E_cache])
+    assert "CHANGED A1" in E_obj
+    assert isinstance(D_obj, pd.DataFrame)
+    assert E_cache.cache_folder != old_E_folder
+    assert created == ["e"]
+
+
+def test_params_json_round_trip(tmp_path):
+    """Test that params written with params_to_json match to_json and load back."""
+    params = PathParams(run_tag="tag", data_path=Path("some/data"))
+    path = tmp_path / "params.json"
+
+    params_to_json(params, path)
+
+    assert json_loads(path.read_bytes()) == json.loads(params.to_json())
+    assert params_from_json(path).run_tag == "tag"